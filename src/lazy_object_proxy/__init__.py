@@ -3,14 +3,21 @@ try:
 except ImportError:
     import copyreg
 
+from .utils import ResolveError
+from .utils import aresolve
 from .utils import identity
+from .utils import resolve_many
+from .utils import unwrap_all
 
 copyreg.constructor(identity)
 
 try:
+    from .cext import AsyncProxy
     from .cext import Proxy
     from .cext import identity
+    from .cext import unwrap_all
 except ImportError:
+    from .simple import AsyncProxy
     from .simple import Proxy
 else:
     copyreg.constructor(identity)
@@ -20,4 +27,4 @@ try:
 except ImportError:
     __version__ = '1.12.0'
 
-__all__ = ('Proxy',)
+__all__ = ('AsyncProxy', 'Proxy', 'ResolveError', 'aresolve', 'resolve_many', 'unwrap_all')
@@ -3,6 +3,29 @@
 #include "Python.h"
 
 #include "structmember.h"
+#include "pythread.h"
+
+#ifdef MS_WINDOWS
+#include <windows.h>
+#else
+#include <time.h>
+#endif
+
+#if PY_VERSION_HEX >= 0x030D0000
+#define Proxy_HAVE_PYMUTEX 1
+#endif
+
+#ifdef Py_GIL_DISABLED
+#define Proxy__LOAD_WRAPPED(self) ((PyObject *)_Py_atomic_load_ptr_acquire(&(self)->wrapped))
+#define Proxy__STORE_WRAPPED(self, value) _Py_atomic_store_ptr_release(&(self)->wrapped, (value))
+#define Proxy__LOAD_RESOLVER(self) _Py_atomic_load_ulong_relaxed(&(self)->resolver)
+#define Proxy__STORE_RESOLVER(self, value) _Py_atomic_store_ulong_relaxed(&(self)->resolver, (value))
+#else
+#define Proxy__LOAD_WRAPPED(self) ((self)->wrapped)
+#define Proxy__STORE_WRAPPED(self, value) ((self)->wrapped = (value))
+#define Proxy__LOAD_RESOLVER(self) ((self)->resolver)
+#define Proxy__STORE_RESOLVER(self, value) ((self)->resolver = (value))
+#endif
 
 #define Proxy__WRAPPED_REPLACE_OR_RETURN_NULL(object) \
     if (PyObject_TypeCheck(object, &Proxy_Type)) { \
@@ -16,21 +39,46 @@
 
 /* ------------------------------------------------------------------------- */
 
+/* Only allocated for proxies created with a ttl. All the times are in nanoseconds, from Proxy__now(). */
+typedef struct {
+    int64_t ttl;
+    int64_t expires;
+    /* When to start a background refresh (same as expires if refresh isn't enabled). */
+    int64_t refresh_at;
+    int refresh;
+    int refreshing;
+} ProxyExpiry;
+
 typedef struct {
     PyObject_HEAD
 
     PyObject *dict;
     PyObject *wrapped;
     PyObject *factory;
+    vectorcallfunc vectorcall;
+    ProxyExpiry *expiry;
+
+    /* Identifier of the thread currently running the factory (0 when idle). */
+    unsigned long resolver;
+#ifdef Proxy_HAVE_PYMUTEX
+    PyMutex mutex;
+#endif
 } ProxyObject;
 
 PyTypeObject Proxy_Type;
+PyTypeObject AsyncProxy_Type;
 
 
 /* ------------------------------------------------------------------------- */
 
 static PyObject *identity_ref = NULL;
 static PyObject *await_ref = NULL;
+static PyObject *aresolve_ref = NULL;
+static PyObject *schedule_refresh_ref = NULL;
+static PyObject *getattr_str = NULL;
+static PyObject *getattr_method = NULL;
+static PyObject *dict_str = NULL;
+static PyObject *python_proxy_types = NULL;
 static PyObject *
 identity(PyObject *self, PyObject *value)
 {
@@ -38,37 +86,196 @@ identity(PyObject *self, PyObject *value)
     return value;
 }
 
+
 /* ------------------------------------------------------------------------- */
 
-PyDoc_STRVAR(identity_doc, "Indentity function: returns the single argument.");
+#ifndef Proxy_HAVE_PYMUTEX
+static void Proxy__wait(void)
+{
+    /* Only used on builds that have a GIL, so it's enough to let it go for a
+       short while to allow the resolving thread to make progress. */
+    Py_BEGIN_ALLOW_THREADS
+#ifdef MS_WINDOWS
+    Sleep(1);
+#else
+    struct timespec delay = { 0, 100000 };
+    nanosleep(&delay, NULL);
+#endif
+    Py_END_ALLOW_THREADS
+}
+#endif
 
-static struct PyMethodDef module_functions[] = {
-    {"identity", identity, METH_O, identity_doc},
-    {NULL,       NULL}
-};
+/* ------------------------------------------------------------------------- */
+
+static int64_t Proxy__now(void)
+{
+    /* A coarse clock is plenty for expiry checks and it's a lot cheaper to read. */
+#ifdef MS_WINDOWS
+    return (int64_t)GetTickCount64() * 1000000;
+#else
+    struct timespec now;
+#ifdef CLOCK_MONOTONIC_COARSE
+    clock_gettime(CLOCK_MONOTONIC_COARSE, &now);
+#else
+    clock_gettime(CLOCK_MONOTONIC, &now);
+#endif
+    return (int64_t)now.tv_sec * 1000000000 + now.tv_nsec;
+#endif
+}
 
 /* ------------------------------------------------------------------------- */
 
-static PyObject *Proxy__ensure_wrapped(ProxyObject *self)
+static void Proxy__renew(ProxyObject *self)
+{
+    ProxyExpiry *expiry = self->expiry;
+
+    if (!expiry)
+        return;
+
+    expiry->expires = Proxy__now() + expiry->ttl;
+    expiry->refresh_at = expiry->refresh ? expiry->expires - expiry->ttl / 4 : expiry->expires;
+    expiry->refreshing = 0;
+}
+
+/* ------------------------------------------------------------------------- */
+
+static int Proxy__is_resolved(ProxyObject *self)
 {
+    if (!Proxy__LOAD_WRAPPED(self))
+        return 0;
+
+    return !self->expiry || Proxy__now() < self->expiry->expires;
+}
+
+/* ------------------------------------------------------------------------- */
+
+static PyObject *Proxy__resolve(ProxyObject *self)
+{
+    unsigned long ident = PyThread_get_thread_ident();
+    PyObject *factory;
     PyObject *wrapped;
+    PyObject *expired;
 
-    if (self->wrapped) {
-        return self->wrapped;
-    } else {
-        if (self->factory) {
-            wrapped = PyObject_CallFunctionObjArgs(self->factory, NULL);
+    if (Proxy__LOAD_RESOLVER(self) == ident) {
+        PyErr_SetString(PyExc_RecursionError, "Proxy's __factory__ tried to resolve the proxy it belongs to.");
+        return NULL;
+    }
+
+#ifdef Proxy_HAVE_PYMUTEX
+    PyMutex_Lock(&self->mutex);
+#else
+    while (self->resolver)
+        Proxy__wait();
+#endif
+
+    wrapped = Proxy__LOAD_WRAPPED(self);
+
+    if (wrapped && !Proxy__is_resolved(self)) {
+        /* Drop the expired target. The recursion guard is on while doing that in case some finalizer touches the
+           proxy. */
+        Proxy__STORE_RESOLVER(self, ident);
+        expired = wrapped;
+        wrapped = NULL;
+        Proxy__STORE_WRAPPED(self, NULL);
+        Py_DECREF(expired);
+        Proxy__STORE_RESOLVER(self, 0);
+    }
+
+    if (!wrapped) {
+        factory = self->factory;
+        if (PyObject_TypeCheck(self, &AsyncProxy_Type)) {
+            PyErr_SetString(PyExc_ValueError, "AsyncProxy hasn't been resolved: it must be awaited first.");
+        } else if (factory) {
+            Py_INCREF(factory);
+            Proxy__STORE_RESOLVER(self, ident);
+            wrapped = PyObject_CallNoArgs(factory);
+            Proxy__STORE_RESOLVER(self, 0);
+            Py_DECREF(factory);
             if (wrapped) {
-                self->wrapped = wrapped;
-                return wrapped;
-            } else {
-                return NULL;
+                Py_XDECREF(self->wrapped);
+                Proxy__STORE_WRAPPED(self, wrapped);
+                Proxy__renew(self);
             }
         } else {
             PyErr_SetString(PyExc_ValueError, "Proxy hasn't been initiated: __factory__ is missing.");
-            return NULL;
         }
     }
+
+#ifdef Proxy_HAVE_PYMUTEX
+    PyMutex_Unlock(&self->mutex);
+#endif
+
+    return wrapped;
+}
+
+/* ------------------------------------------------------------------------- */
+
+static PyObject *Proxy__refresh(ProxyObject *self)
+{
+    ProxyExpiry *expiry = self->expiry;
+    PyObject *wrapped;
+    PyObject *result;
+
+    if (Proxy__now() >= expiry->expires)
+        return Proxy__resolve(self);
+
+    /* Close to expiry: serve the current target and let a background thread get the next one. */
+    if (!expiry->refreshing) {
+        expiry->refreshing = 1;
+        result = PyObject_CallOneArg(schedule_refresh_ref, (PyObject *)self);
+        if (!result)
+            return NULL;
+        Py_DECREF(result);
+    }
+
+    wrapped = Proxy__LOAD_WRAPPED(self);
+
+    if (wrapped)
+        return wrapped;
+
+    return Proxy__resolve(self);
+}
+
+/* ------------------------------------------------------------------------- */
+
+static PyObject *Proxy__ensure_wrapped(ProxyObject *self)
+{
+    PyObject *wrapped = Proxy__LOAD_WRAPPED(self);
+
+    if (wrapped) {
+        if (!self->expiry || Proxy__now() < self->expiry->refresh_at)
+            return wrapped;
+
+        return Proxy__refresh(self);
+    }
+
+    return Proxy__resolve(self);
+}
+
+/* ------------------------------------------------------------------------- */
+
+static PyObject *Proxy_vectorcall(ProxyObject *self,
+        PyObject *const *args, size_t nargsf, PyObject *kwnames);
+
+/* ------------------------------------------------------------------------- */
+
+static int Proxy__set_dict_item(ProxyObject *self,
+        const char *key, PyObject *value)
+{
+    PyObject *dict = NULL;
+    int result;
+
+    /* The instance dict is only allocated when something is stored in it. */
+    dict = PyObject_GenericGetDict((PyObject *)self, NULL);
+
+    if (!dict)
+        return -1;
+
+    result = PyDict_SetItemString(dict, key, value);
+
+    Py_DECREF(dict);
+
+    return result;
 }
 
 /* ------------------------------------------------------------------------- */
@@ -83,9 +290,12 @@ static PyObject *Proxy_new(PyTypeObject *type,
     if (!self)
         return NULL;
 
-    self->dict = PyDict_New();
+    self->dict = NULL;
     self->wrapped = NULL;
     self->factory = NULL;
+    self->vectorcall = (vectorcallfunc)Proxy_vectorcall;
+    self->expiry = NULL;
+    self->resolver = 0;
 
     return (PyObject *)self;
 }
@@ -93,12 +303,37 @@ static PyObject *Proxy_new(PyTypeObject *type,
 /* ------------------------------------------------------------------------- */
 
 static int Proxy_raw_init(ProxyObject *self,
-        PyObject *factory)
-{
+        PyObject *factory, PyObject *ttl, int refresh)
+{
+    ProxyExpiry *expiry = NULL;
+    double seconds;
+
+    if (ttl && ttl != Py_None) {
+        seconds = PyFloat_AsDouble(ttl);
+        if (seconds == -1.0 && PyErr_Occurred())
+            return -1;
+        if (!(seconds > 0)) {
+            PyErr_SetString(PyExc_ValueError, "ttl must be a positive number of seconds.");
+            return -1;
+        }
+        expiry = PyMem_Calloc(1, sizeof(ProxyExpiry));
+        if (!expiry) {
+            PyErr_NoMemory();
+            return -1;
+        }
+        expiry->ttl = (int64_t)(seconds * 1e9);
+        expiry->refresh = refresh;
+    } else if (refresh) {
+        PyErr_SetString(PyExc_ValueError, "refresh can only be used together with a ttl.");
+        return -1;
+    }
+
     Py_INCREF(factory);
-    Py_XDECREF(self->wrapped);
+    Py_CLEAR(self->wrapped);
     Py_XDECREF(self->factory);
     self->factory = factory;
+    PyMem_Free(self->expiry);
+    self->expiry = expiry;
 
     return 0;
 }
@@ -109,15 +344,17 @@ static int Proxy_init(ProxyObject *self,
         PyObject *args, PyObject *kwds)
 {
     PyObject *wrapped = NULL;
+    PyObject *ttl = NULL;
+    int refresh = 0;
 
-    static char *kwlist[] = { "wrapped", NULL };
+    static char *kwlist[] = { "wrapped", "ttl", "refresh", NULL };
 
-    if (!PyArg_ParseTupleAndKeywords(args, kwds, "O:ObjectProxy",
-            kwlist, &wrapped)) {
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "O|$Op:ObjectProxy",
+            kwlist, &wrapped, &ttl, &refresh)) {
         return -1;
     }
 
-    return Proxy_raw_init(self, wrapped);
+    return Proxy_raw_init(self, wrapped, ttl, refresh);
 }
 
 /* ------------------------------------------------------------------------- */
@@ -149,6 +386,8 @@ static void Proxy_dealloc(ProxyObject *self)
 
     Proxy_clear(self);
 
+    PyMem_Free(self->expiry);
+
     Py_TYPE(self)->tp_free(self);
 }
 
@@ -937,7 +1176,7 @@ static int Proxy_set_module(ProxyObject *self,
     if (PyObject_SetAttrString(self->wrapped, "__module__", value) == -1)
         return -1;
 
-    return PyDict_SetItemString(self->dict, "__module__", value);
+    return Proxy__set_dict_item(self, "__module__", value);
 }
 
 /* ------------------------------------------------------------------------- */
@@ -960,7 +1199,7 @@ static int Proxy_set_doc(ProxyObject *self,
     if (PyObject_SetAttrString(self->wrapped, "__doc__", value) == -1)
         return -1;
 
-    return PyDict_SetItemString(self->dict, "__doc__", value);
+    return Proxy__set_dict_item(self, "__doc__", value);
 }
 
 /* ------------------------------------------------------------------------- */
@@ -1000,7 +1239,7 @@ static PyObject *Proxy_get_resolved(
 {
     PyObject *result;
 
-    result = self->wrapped ? Py_True : Py_False;
+    result = Proxy__is_resolved(self) ? Py_True : Py_False;
     Py_INCREF(result);
     return result;
 }
@@ -1021,10 +1260,13 @@ static PyObject *Proxy_get_wrapped(
 static int Proxy_set_wrapped(ProxyObject *self,
         PyObject *value)
 {
-    if (value) Py_INCREF(value);
-    Py_XDECREF(self->wrapped);
+    PyObject *wrapped = self->wrapped;
 
-    self->wrapped = value;
+    Py_XINCREF(value);
+    Proxy__STORE_WRAPPED(self, value);
+    if (value)
+        Proxy__renew(self);
+    Py_XDECREF(wrapped);
 
     return 0;
 }
@@ -1056,28 +1298,43 @@ static int Proxy_set_factory(ProxyObject *self,
 static PyObject *Proxy_getattro(
         ProxyObject *self, PyObject *name)
 {
+    PyTypeObject *type = Py_TYPE(self);
     PyObject *object = NULL;
     PyObject *result = NULL;
+    int in_dict = 0;
+
+    /* Fast path: if neither the type nor the instance dict know about the attribute and __getattr__ isn't overridden
+       in a subclass then the generic lookup would just fail and end up in Proxy_getattr. Skip all that (and the
+       AttributeError it would raise) and go straight to the wrapped object. */
+    if (!_PyType_Lookup(type, name)) {
+        if (self->dict) {
+            in_dict = PyDict_Contains(self->dict, name);
+            if (in_dict < 0)
+                return NULL;
+        }
+        if (!in_dict && (type == &Proxy_Type || _PyType_Lookup(type, getattr_str) == getattr_method)) {
+            Proxy__ENSURE_WRAPPED_OR_RETURN_NULL(self);
 
-    static PyObject *getattr_str = NULL;
+            return PyObject_GetAttr(self->wrapped, name);
+        }
+    }
 
     object = PyObject_GenericGetAttr((PyObject *)self, name);
 
     if (object)
         return object;
 
-    PyErr_Clear();
+    if (!PyErr_ExceptionMatches(PyExc_AttributeError))
+        return NULL;
 
-    if (!getattr_str) {
-        getattr_str = PyUnicode_InternFromString("__getattr__");
-    }
+    PyErr_Clear();
 
     object = PyObject_GenericGetAttr((PyObject *)self, getattr_str);
 
     if (!object)
         return NULL;
 
-    result = PyObject_CallFunctionObjArgs(object, name, NULL);
+    result = PyObject_CallOneArg(object, name);
 
     Py_DECREF(object);
 
@@ -1141,6 +1398,16 @@ static PyObject *Proxy_call(
     return PyObject_Call(self->wrapped, args, kwds);
 }
 
+/* ------------------------------------------------------------------------- */
+
+static PyObject *Proxy_vectorcall(ProxyObject *self,
+        PyObject *const *args, size_t nargsf, PyObject *kwnames)
+{
+    Proxy__ENSURE_WRAPPED_OR_RETURN_NULL(self);
+
+    return PyObject_Vectorcall(self->wrapped, args, nargsf, kwnames);
+}
+
 /* ------------------------------------------------------------------------- */;
 
 static PyObject *Proxy_aenter(ProxyObject *self)
@@ -1355,7 +1622,7 @@ PyTypeObject Proxy_Type = {
     0,                              /*tp_itemsize*/
     /* methods */
     (destructor)Proxy_dealloc,      /*tp_dealloc*/
-    0,                              /*tp_print*/
+    offsetof(ProxyObject, vectorcall), /*tp_vectorcall_offset*/
     0,                              /*tp_getattr*/
     0,                              /*tp_setattr*/
     &Proxy_as_async,                /* tp_as_async */
@@ -1369,7 +1636,7 @@ PyTypeObject Proxy_Type = {
     (getattrofunc)Proxy_getattro,   /*tp_getattro*/
     (setattrofunc)Proxy_setattro,   /*tp_setattro*/
     0,                              /*tp_as_buffer*/
-    Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE | Py_TPFLAGS_HAVE_GC,
+    Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE | Py_TPFLAGS_HAVE_GC | Py_TPFLAGS_HAVE_VECTORCALL,
                                     /*tp_flags*/
     0,                              /*tp_doc*/
     (traverseproc)Proxy_traverse,   /*tp_traverse*/
@@ -1395,6 +1662,381 @@ PyTypeObject Proxy_Type = {
 
 /* ------------------------------------------------------------------------- */
 
+static PyObject *AsyncProxy_await(ProxyObject *self)
+{
+    PyObject *coroutine = NULL;
+    PyObject *result = NULL;
+
+    coroutine = PyObject_CallOneArg(aresolve_ref, (PyObject *)self);
+
+    if (!coroutine)
+        return NULL;
+
+    result = Py_TYPE(coroutine)->tp_as_async->am_await(coroutine);
+
+    Py_DECREF(coroutine);
+
+    return result;
+}
+
+/* ------------------------------------------------------------------------- */
+
+static PyAsyncMethods AsyncProxy_as_async = {
+    (unaryfunc)AsyncProxy_await, /* am_await */
+    (unaryfunc)Proxy_aiter,      /* am_aiter */
+    (unaryfunc)Proxy_anext,      /* am_anext */
+};
+
+PyDoc_STRVAR(AsyncProxy_doc,
+"A proxy for objects created by an async factory (a coroutine function). It needs to be resolved by awaiting it\n"
+"(``await proxy`` or ``await aresolve(proxy)``, both return the wrapped object), afterwards it works just like a\n"
+"regular proxy.");
+
+PyTypeObject AsyncProxy_Type = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "AsyncProxy",
+    .tp_basicsize = sizeof(ProxyObject),
+    .tp_dealloc = (destructor)Proxy_dealloc,
+    .tp_vectorcall_offset = offsetof(ProxyObject, vectorcall),
+    .tp_as_async = &AsyncProxy_as_async,
+    .tp_flags = Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE | Py_TPFLAGS_HAVE_GC | Py_TPFLAGS_HAVE_VECTORCALL,
+    .tp_doc = AsyncProxy_doc,
+    .tp_traverse = (traverseproc)Proxy_traverse,
+    .tp_clear = (inquiry)Proxy_clear,
+    .tp_base = &Proxy_Type,
+};
+
+/* ------------------------------------------------------------------------- */
+
+typedef struct {
+    PyObject *memo;
+    PyObject *keepalive;
+    PyObject *proxy_types;
+    int resolve;
+} UnwrapState;
+
+/* ------------------------------------------------------------------------- */
+
+static int unwrap_all__is_python_proxy(UnwrapState *state, PyTypeObject *type)
+{
+    Py_ssize_t i;
+
+    for (i = 0; i < PyTuple_GET_SIZE(state->proxy_types); i++) {
+        if (PyType_IsSubtype(type, (PyTypeObject *)PyTuple_GET_ITEM(state->proxy_types, i)))
+            return 1;
+    }
+
+    return 0;
+}
+
+/* ------------------------------------------------------------------------- */
+
+static PyObject *unwrap_all__target(UnwrapState *state, PyObject *obj, int *unresolved)
+{
+    PyObject *target = NULL;
+    int resolved;
+
+    Py_INCREF(obj);
+
+    for (;;) {
+        if (PyObject_TypeCheck(obj, &Proxy_Type)) {
+            if (!state->resolve && !Proxy__is_resolved((ProxyObject *)obj)) {
+                *unresolved = 1;
+                return obj;
+            }
+
+            target = Proxy__ensure_wrapped((ProxyObject *)obj);
+            Py_XINCREF(target);
+        } else if (unwrap_all__is_python_proxy(state, Py_TYPE(obj))) {
+            if (!state->resolve) {
+                target = PyObject_GetAttrString(obj, "__resolved__");
+                if (!target) {
+                    Py_DECREF(obj);
+                    return NULL;
+                }
+                resolved = PyObject_IsTrue(target);
+                Py_DECREF(target);
+                if (resolved < 0) {
+                    Py_DECREF(obj);
+                    return NULL;
+                }
+                if (!resolved) {
+                    *unresolved = 1;
+                    return obj;
+                }
+            }
+
+            target = PyObject_GetAttrString(obj, "__wrapped__");
+        } else {
+            return obj;
+        }
+
+        Py_DECREF(obj);
+
+        if (!target)
+            return NULL;
+
+        obj = target;
+    }
+}
+
+/* ------------------------------------------------------------------------- */
+
+static PyObject *unwrap_all__unwrap(UnwrapState *state, PyObject *obj);
+
+static int unwrap_all__tuple(UnwrapState *state, PyObject **obj)
+{
+    PyObject *tuple = *obj;
+    PyObject *result = NULL;
+    PyObject *item = NULL;
+    PyObject *new = NULL;
+    Py_ssize_t size = PyTuple_GET_SIZE(tuple);
+    Py_ssize_t i, j;
+
+    for (i = 0; i < size; i++) {
+        item = PyTuple_GET_ITEM(tuple, i);
+        new = unwrap_all__unwrap(state, item);
+        if (!new) {
+            Py_XDECREF(result);
+            return -1;
+        }
+        if (!result && new != item) {
+            result = PyTuple_New(size);
+            if (!result) {
+                Py_DECREF(new);
+                return -1;
+            }
+            for (j = 0; j < i; j++) {
+                Py_INCREF(PyTuple_GET_ITEM(tuple, j));
+                PyTuple_SET_ITEM(result, j, PyTuple_GET_ITEM(tuple, j));
+            }
+        }
+        if (result)
+            PyTuple_SET_ITEM(result, i, new);
+        else
+            Py_DECREF(new);
+    }
+
+    if (result) {
+        Py_DECREF(tuple);
+        *obj = result;
+    }
+
+    return 0;
+}
+
+/* ------------------------------------------------------------------------- */
+
+static int unwrap_all__list(UnwrapState *state, PyObject *list)
+{
+    PyObject *item = NULL;
+    PyObject *new = NULL;
+    PyObject *index = NULL;
+    Py_ssize_t i;
+    int result;
+
+    for (i = 0; i < PyList_GET_SIZE(list); i++) {
+        item = PyList_GET_ITEM(list, i);
+        Py_INCREF(item);
+        new = unwrap_all__unwrap(state, item);
+        if (!new) {
+            Py_DECREF(item);
+            return -1;
+        }
+        if (new == item) {
+            result = 0;
+            Py_DECREF(new);
+        } else if (PyList_CheckExact(list)) {
+            result = PyList_SetItem(list, i, new);
+        } else {
+            index = PyLong_FromSsize_t(i);
+            result = index ? PyObject_SetItem(list, index, new) : -1;
+            Py_XDECREF(index);
+            Py_DECREF(new);
+        }
+        Py_DECREF(item);
+        if (result < 0)
+            return -1;
+    }
+
+    return 0;
+}
+
+/* ------------------------------------------------------------------------- */
+
+static int unwrap_all__dict(UnwrapState *state, PyObject *dict)
+{
+    PyObject *key = NULL;
+    PyObject *value = NULL;
+    PyObject *new = NULL;
+    Py_ssize_t pos = 0;
+    int result;
+
+    /* Only values get replaced (the set of keys doesn't change) so it's safe to keep iterating. */
+    while (PyDict_Next(dict, &pos, &key, &value)) {
+        Py_INCREF(key);
+        Py_INCREF(value);
+        new = unwrap_all__unwrap(state, value);
+        if (!new) {
+            result = -1;
+        } else if (new == value) {
+            result = 0;
+        } else if (PyDict_CheckExact(dict)) {
+            result = PyDict_SetItem(dict, key, new);
+        } else {
+            result = PyObject_SetItem(dict, key, new);
+        }
+        Py_XDECREF(new);
+        Py_DECREF(value);
+        Py_DECREF(key);
+        if (result < 0)
+            return -1;
+    }
+
+    return 0;
+}
+
+/* ------------------------------------------------------------------------- */
+
+static PyObject *unwrap_all__unwrap(UnwrapState *state, PyObject *obj)
+{
+    PyTypeObject *type = NULL;
+    PyObject *key = NULL;
+    PyObject *memoized = NULL;
+    PyObject *namespace = NULL;
+    int unresolved = 0;
+    int result = 0;
+
+    obj = unwrap_all__target(state, obj, &unresolved);
+
+    if (!obj)
+        return NULL;
+
+    type = Py_TYPE(obj);
+
+    if (unresolved)
+        return obj;
+
+    if (!PyTuple_CheckExact(obj) && !PyList_Check(obj) && !PyDict_Check(obj) &&
+            !(PyType_HasFeature(type, Py_TPFLAGS_HEAPTYPE) && !PyType_Check(obj)))
+        return obj;
+
+    key = PyLong_FromVoidPtr(obj);
+
+    if (!key)
+        goto error;
+
+    memoized = PyDict_GetItemWithError(state->memo, key);
+
+    if (memoized) {
+        Py_INCREF(memoized);
+        Py_DECREF(obj);
+        Py_DECREF(key);
+        return memoized;
+    }
+
+    if (PyErr_Occurred() || PyDict_SetItem(state->memo, key, obj) < 0 || PyList_Append(state->keepalive, obj) < 0)
+        goto error;
+
+    if (Py_EnterRecursiveCall(" while unwrapping proxies"))
+        goto error;
+
+    if (PyTuple_CheckExact(obj)) {
+        result = unwrap_all__tuple(state, &obj);
+        if (!result)
+            result = PyDict_SetItem(state->memo, key, obj);
+    } else if (PyList_Check(obj)) {
+        result = unwrap_all__list(state, obj);
+    } else if (PyDict_Check(obj)) {
+        result = unwrap_all__dict(state, obj);
+    } else {
+        namespace = PyObject_GenericGetAttr(obj, dict_str);
+        if (namespace) {
+            Py_SETREF(namespace, unwrap_all__unwrap(state, namespace));
+            result = namespace ? 0 : -1;
+            Py_XDECREF(namespace);
+        } else if (PyErr_ExceptionMatches(PyExc_AttributeError)) {
+            PyErr_Clear();
+        } else {
+            result = -1;
+        }
+    }
+
+    Py_LeaveRecursiveCall();
+
+    if (result < 0)
+        goto error;
+
+    Py_DECREF(key);
+    return obj;
+
+error:
+    Py_XDECREF(key);
+    Py_DECREF(obj);
+    return NULL;
+}
+
+/* ------------------------------------------------------------------------- */
+
+static PyObject *unwrap_all(PyObject *self, PyObject *args, PyObject *kwds)
+{
+    PyObject *container = NULL;
+    PyObject *result = NULL;
+    PyObject *utils_module = NULL;
+    UnwrapState state = { NULL, NULL, NULL, 0 };
+
+    static char *kwlist[] = { "container", "resolve", NULL };
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "O|p:unwrap_all",
+            kwlist, &container, &state.resolve)) {
+        return NULL;
+    }
+
+    if (!python_proxy_types) {
+        utils_module = PyImport_ImportModule("lazy_object_proxy.utils");
+        if (!utils_module)
+            return NULL;
+        python_proxy_types = PyObject_CallMethod(utils_module, "python_proxy_types", NULL);
+        Py_DECREF(utils_module);
+        if (!python_proxy_types)
+            return NULL;
+        if (!PyTuple_Check(python_proxy_types)) {
+            Py_CLEAR(python_proxy_types);
+            PyErr_SetString(PyExc_TypeError, "python_proxy_types() must return a tuple");
+            return NULL;
+        }
+    }
+
+    state.proxy_types = python_proxy_types;
+    state.memo = PyDict_New();
+    state.keepalive = PyList_New(0);
+
+    if (state.memo && state.keepalive)
+        result = unwrap_all__unwrap(&state, container);
+
+    Py_XDECREF(state.memo);
+    Py_XDECREF(state.keepalive);
+
+    return result;
+}
+
+/* ------------------------------------------------------------------------- */
+
+PyDoc_STRVAR(identity_doc, "Indentity function: returns the single argument.");
+
+PyDoc_STRVAR(unwrap_all_doc,
+"unwrap_all(container, resolve=False)\n"
+"\n"
+"Replaces the proxies found in container with the objects they wrap.");
+
+static struct PyMethodDef module_functions[] = {
+    {"identity",   identity,                METH_O,                       identity_doc},
+    {"unwrap_all", (PyCFunction)unwrap_all, METH_VARARGS | METH_KEYWORDS, unwrap_all_doc},
+    {NULL,         NULL}
+};
+
+/* ------------------------------------------------------------------------- */
+
 static struct PyModuleDef moduledef = {
     PyModuleDef_HEAD_INIT,
     "lazy_object_proxy.cext", /* m_name */
@@ -1421,6 +2063,21 @@ moduleinit(void)
     if (PyType_Ready(&Proxy_Type) < 0)
         return NULL;
 
+    if (PyType_Ready(&AsyncProxy_Type) < 0)
+        return NULL;
+
+    getattr_str = PyUnicode_InternFromString("__getattr__");
+    if (getattr_str == NULL)
+        return NULL;
+    getattr_method = _PyType_Lookup(&Proxy_Type, getattr_str);
+    if (getattr_method == NULL)
+        return NULL;
+    Py_INCREF(getattr_method);
+
+    dict_str = PyUnicode_InternFromString("__dict__");
+    if (dict_str == NULL)
+        return NULL;
+
     dict = PyModule_GetDict(module);
     if (dict == NULL)
         return NULL;
@@ -1434,13 +2091,28 @@ moduleinit(void)
         return NULL;
 
     await_ref = PyObject_GetAttrString(utils_module, "await_");
+    if (await_ref == NULL) {
+        Py_DECREF(utils_module);
+        return NULL;
+    }
+
+    aresolve_ref = PyObject_GetAttrString(utils_module, "aresolve");
+    if (aresolve_ref == NULL) {
+        Py_DECREF(utils_module);
+        return NULL;
+    }
+
+    schedule_refresh_ref = PyObject_GetAttrString(utils_module, "schedule_refresh");
     Py_DECREF(utils_module);
-    if (await_ref == NULL)
+    if (schedule_refresh_ref == NULL)
         return NULL;
 
     Py_INCREF(&Proxy_Type);
     PyModule_AddObject(module, "Proxy", (PyObject *)&Proxy_Type);
 
+    Py_INCREF(&AsyncProxy_Type);
+    PyModule_AddObject(module, "AsyncProxy", (PyObject *)&AsyncProxy_Type);
+
 #ifdef Py_GIL_DISABLED
     PyUnstable_Module_SetGIL(module, Py_MOD_GIL_NOT_USED);
 #endif
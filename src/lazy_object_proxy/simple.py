@@ -3,6 +3,7 @@ import sys
 
 from .compat import string_types
 from .compat import with_metaclass
+from .utils import aresolve
 from .utils import await_
 from .utils import cached_property
 from .utils import identity
@@ -263,3 +264,18 @@ class Proxy(with_metaclass(_ProxyMetaType)):
     if sys.hexversion >= 0x03070000:
         def __mro_entries__(self, _):
             return (self.__wrapped__,)
+
+
+class AsyncProxy(Proxy):
+    """
+    A proxy for objects created by an async factory (a coroutine function). It needs to be resolved by awaiting it
+    (``await proxy`` or ``await aresolve(proxy)``, both return the wrapped object), afterwards it works just like a
+    regular proxy.
+    """
+
+    @cached_property
+    def __wrapped__(self):
+        raise ValueError("AsyncProxy hasn't been resolved: it must be awaited first.")
+
+    def __await__(self):
+        return aresolve(self).__await__()
@@ -1,7 +1,10 @@
 import operator
+from time import monotonic
 
 from .compat import string_types
 from .compat import with_metaclass
+from .utils import Expiry
+from .utils import aresolve
 from .utils import await_
 from .utils import identity
 
@@ -70,17 +73,19 @@ class Proxy(with_metaclass(_ProxyMetaType)):
 
     * ``__factory__`` is the callback that "materializes" the object we proxy to.
     * ``__target__`` will contain the object we proxy to, once it's "materialized".
-    * ``__resolved__`` is a boolean, `True` if factory was called.
+    * ``__resolved__`` is a boolean, `True` if factory was called (and the result didn't expire).
+    * ``__expiry__`` is ``None``, or the :class:`~lazy_object_proxy.utils.Expiry` if a `ttl` was given.
     * ``__wrapped__`` is a property that does either:
 
-      * return ``__target__`` if it's set.
+      * return ``__target__`` if it's set (and didn't expire).
       * calls ``__factory__``, saves result to ``__target__`` and returns said result.
     """
 
-    __slots__ = '__factory__', '__target__'
+    __slots__ = '__factory__', '__target__', '__expiry__'
 
-    def __init__(self, factory):
+    def __init__(self, factory, *, ttl=None, refresh=False):
         object.__setattr__(self, '__factory__', factory)
+        object.__setattr__(self, '__expiry__', Expiry.create(ttl, refresh))
 
     @property
     def __resolved__(self, __getattr__=object.__getattribute__):
@@ -88,29 +93,52 @@ class Proxy(with_metaclass(_ProxyMetaType)):
             __getattr__(self, '__target__')
         except AttributeError:
             return False
-        else:
+        try:
+            expiry = __getattr__(self, '__expiry__')
+        except AttributeError:
             return True
+        return expiry is None or monotonic() < expiry.expires
 
     @property
     def __wrapped__(self, __getattr__=object.__getattribute__, __setattr__=object.__setattr__, __delattr__=object.__delattr__):
         try:
-            return __getattr__(self, '__target__')
+            target = __getattr__(self, '__target__')
         except AttributeError:
+            expiry = None
+        else:
+            try:
+                expiry = __getattr__(self, '__expiry__')
+            except AttributeError:
+                return target
+            if expiry is None or expiry.fresh(self):
+                return target
             try:
-                factory = __getattr__(self, '__factory__')
-            except AttributeError as exc:
-                raise ValueError("Proxy hasn't been initiated: __factory__ is missing.") from exc
-            target = factory()
-            __setattr__(self, '__target__', target)
-            return target
+                __delattr__(self, '__target__')
+            except AttributeError:
+                pass
+        try:
+            factory = __getattr__(self, '__factory__')
+        except AttributeError as exc:
+            raise ValueError("Proxy hasn't been initiated: __factory__ is missing.") from exc
+        target = factory()
+        __setattr__(self, '__target__', target)
+        if expiry is not None:
+            expiry.renew()
+        return target
 
     @__wrapped__.deleter
     def __wrapped__(self, __delattr__=object.__delattr__):
         __delattr__(self, '__target__')
 
     @__wrapped__.setter
-    def __wrapped__(self, target, __setattr__=object.__setattr__):
+    def __wrapped__(self, target, __getattr__=object.__getattribute__, __setattr__=object.__setattr__):
         __setattr__(self, '__target__', target)
+        try:
+            expiry = __getattr__(self, '__expiry__')
+        except AttributeError:
+            return
+        if expiry is not None:
+            expiry.renew()
 
     @property
     def __name__(self):
@@ -440,3 +468,45 @@ class Proxy(with_metaclass(_ProxyMetaType)):
         from .utils import __await__
 
         __aiter__, __anext__, __await__, __aenter__, __aexit__  # noqa
+
+
+class AsyncProxy(Proxy):
+    """
+    A proxy for objects created by an async factory (a coroutine function). It needs to be resolved by awaiting it
+    (``await proxy`` or ``await aresolve(proxy)``, both return the wrapped object), afterwards it works just like a
+    regular proxy.
+    """
+
+    __slots__ = ()
+
+    @property
+    def __wrapped__(self, __getattr__=object.__getattribute__):
+        try:
+            target = __getattr__(self, '__target__')
+        except AttributeError:
+            pass
+        else:
+            try:
+                expiry = __getattr__(self, '__expiry__')
+            except AttributeError:
+                return target
+            if expiry is None or expiry.fresh(self):
+                return target
+        raise ValueError("AsyncProxy hasn't been resolved: it must be awaited first.")
+
+    @__wrapped__.deleter
+    def __wrapped__(self, __delattr__=object.__delattr__):
+        __delattr__(self, '__target__')
+
+    @__wrapped__.setter
+    def __wrapped__(self, target, __getattr__=object.__getattribute__, __setattr__=object.__setattr__):
+        __setattr__(self, '__target__', target)
+        try:
+            expiry = __getattr__(self, '__expiry__')
+        except AttributeError:
+            return
+        if expiry is not None:
+            expiry.renew()
+
+    def __await__(self):
+        return aresolve(self).__await__()
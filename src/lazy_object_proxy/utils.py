@@ -1,8 +1,13 @@
+import threading
 from collections.abc import Awaitable
+from concurrent.futures import ThreadPoolExecutor
 from inspect import CO_ITERABLE_COROUTINE
+from time import monotonic
 from types import CoroutineType
 from types import GeneratorType
 
+Py_TPFLAGS_HEAPTYPE = 1 << 9
+
 
 async def do_await(obj):
     return await obj
@@ -57,3 +62,272 @@ class cached_property:
             return self
         value = obj.__dict__[self.func.__name__] = self.func(obj)
         return value
+
+
+class Expiry:
+    """
+    Expiry bookkeeping for the pure Python proxies created with a `ttl`. Times are from :func:`time.monotonic`.
+    """
+
+    __slots__ = 'ttl', 'refresh', 'expires', 'refresh_at', 'refreshing'
+
+    def __init__(self, ttl, refresh):
+        if not ttl > 0:
+            raise ValueError('ttl must be a positive number of seconds.')
+        self.ttl = ttl
+        self.refresh = refresh
+        self.expires = self.refresh_at = 0
+        self.refreshing = False
+
+    @classmethod
+    def create(cls, ttl, refresh):
+        if ttl is not None:
+            return cls(ttl, refresh)
+        elif refresh:
+            raise ValueError('refresh can only be used together with a ttl.')
+
+    def renew(self):
+        self.expires = expires = monotonic() + self.ttl
+        self.refresh_at = expires - self.ttl / 4 if self.refresh else expires
+        self.refreshing = False
+
+    def fresh(self, proxy):
+        now = monotonic()
+        if now < self.refresh_at:
+            return True
+        elif now < self.expires:
+            if not self.refreshing:
+                self.refreshing = True
+                schedule_refresh(proxy)
+            return True
+        else:
+            return False
+
+
+refresh_executor = None
+refresh_executor_lock = threading.Lock()
+refresh_tasks = set()
+
+
+def do_refresh(proxy):
+    try:
+        target = proxy.__factory__()
+    except Exception:
+        return
+    proxy.__wrapped__ = target
+
+
+async def do_arefresh(proxy):
+    try:
+        target = await proxy.__factory__()
+    except Exception:
+        return
+    proxy.__wrapped__ = target
+
+
+def schedule_refresh(proxy):
+    """
+    Starts a background refresh for a proxy created with ``refresh=True`` that got close to its expiry. The factory
+    runs on a worker thread (or as a task on the running event loop for an ``AsyncProxy``) and its result replaces the
+    target. If the factory fails the current target is kept until it expires.
+    """
+    global refresh_executor
+
+    if issubclass(type(proxy), async_proxy_types()):
+        import asyncio
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(do_arefresh(proxy))
+        refresh_tasks.add(task)
+        task.add_done_callback(refresh_tasks.discard)
+        return
+
+    if refresh_executor is None:
+        with refresh_executor_lock:
+            if refresh_executor is None:
+                refresh_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='lazy-object-proxy-refresh')
+    try:
+        refresh_executor.submit(do_refresh, proxy)
+    except RuntimeError:  # interpreter shutdown
+        pass
+
+
+def python_proxy_types():
+    from .simple import Proxy as SimpleProxy
+    from .slots import Proxy as SlotsProxy
+
+    return SlotsProxy, SimpleProxy
+
+
+def async_proxy_types():
+    from .simple import AsyncProxy as SimpleAsyncProxy
+    from .slots import AsyncProxy as SlotsAsyncProxy
+
+    try:
+        from .cext import AsyncProxy
+    except ImportError:
+        return SlotsAsyncProxy, SimpleAsyncProxy
+    else:
+        return SlotsAsyncProxy, SimpleAsyncProxy, AsyncProxy
+
+
+def proxy_types():
+    types = python_proxy_types()
+    try:
+        from .cext import Proxy
+    except ImportError:
+        return types
+    else:
+        return (*types, Proxy)
+
+
+def unwrap_all(container, resolve=False):
+    """
+    Replaces the proxies found in `container` with the objects they wrap.
+
+    Lists, dicts and the ``__dict__`` of instances of user-defined classes are changed in place, tuples are rebuilt.
+    Unresolved proxies are left alone unless `resolve` is true, in which case their factories are called.
+
+    Returns `container` or its replacement (when it is a proxy itself or a tuple that had proxies in it).
+    """
+    types = proxy_types()
+    memo = {}
+    keepalive = []
+
+    def unwrap(obj):
+        while issubclass(type(obj), types):
+            if not resolve and not obj.__resolved__:
+                return obj
+            obj = obj.__wrapped__
+
+        obj_type = type(obj)
+        is_instance = obj_type.__flags__ & Py_TPFLAGS_HEAPTYPE and not isinstance(obj, type)
+        if obj_type is not tuple and not isinstance(obj, (list, dict)) and not is_instance:
+            return obj
+
+        key = id(obj)
+        if key in memo:
+            return memo[key]
+        memo[key] = obj
+        keepalive.append(obj)
+
+        if obj_type is tuple:
+            items = tuple(unwrap(item) for item in obj)
+            if any(new is not old for new, old in zip(items, obj)):
+                memo[key] = obj = items
+        elif isinstance(obj, list):
+            for i, item in enumerate(obj):
+                new = unwrap(item)
+                if new is not item:
+                    obj[i] = new
+        elif isinstance(obj, dict):
+            for name, value in obj.items():
+                new = unwrap(value)
+                if new is not value:
+                    obj[name] = new
+        else:
+            try:
+                namespace = object.__getattribute__(obj, '__dict__')
+            except AttributeError:
+                pass
+            else:
+                unwrap(namespace)
+        return obj
+
+    return unwrap(container)
+
+
+class ResolveError(Exception):
+    """
+    Raised by :func:`resolve_many` when some of the factories failed.
+
+    The `proxies` and `exceptions` attributes have the proxies that couldn't be resolved and the exceptions their
+    factories raised, in the order the proxies were given.
+    """
+
+    def __init__(self, proxies, exceptions):
+        super().__init__(f'{len(exceptions)} of the proxies failed to resolve: {exceptions!r}')
+        self.proxies = proxies
+        self.exceptions = exceptions
+
+
+def resolve_many(proxies, executor=None):
+    """
+    Resolves the given proxies concurrently, running their factories on `executor` (a new ``ThreadPoolExecutor`` is
+    used if not given). Proxies that are already resolved and objects that aren't proxies are left alone.
+
+    Returns a list with the objects the proxies wrap (in the given order). If any factory fails the other proxies are
+    still resolved and then a :class:`ResolveError` is raised.
+    """
+    proxies = list(proxies)
+    types = proxy_types()
+    pending = {}
+    for proxy in proxies:
+        if issubclass(type(proxy), types) and not proxy.__resolved__:
+            pending[id(proxy)] = proxy
+    pending = list(pending.values())
+
+    if len(pending) == 1:
+        try:
+            pending[0].__wrapped__  # noqa: B018
+        except Exception as exception:
+            raise ResolveError(pending, [exception]) from None
+    elif pending:
+        if executor is None:
+            with ThreadPoolExecutor(max_workers=min(len(pending), 32)) as executor:
+                futures = [executor.submit(getattr, proxy, '__wrapped__') for proxy in pending]
+        else:
+            futures = [executor.submit(getattr, proxy, '__wrapped__') for proxy in pending]
+        failed = []
+        exceptions = []
+        for proxy, future in zip(pending, futures):
+            exception = future.exception()
+            if exception is None:
+                continue
+            elif not isinstance(exception, Exception):
+                raise exception
+            failed.append(proxy)
+            exceptions.append(exception)
+        if exceptions:
+            raise ResolveError(failed, exceptions)
+
+    return [proxy.__wrapped__ if issubclass(type(proxy), types) else proxy for proxy in proxies]
+
+
+pending_resolutions = {}
+
+
+async def do_aresolve(proxy, key):
+    try:
+        target = await proxy.__factory__()
+        proxy.__wrapped__ = target
+        return target
+    finally:
+        pending_resolutions.pop(key, None)
+
+
+async def aresolve(proxy):
+    """
+    Resolves an ``AsyncProxy`` by awaiting the coroutine returned by its factory, and returns the wrapped object.
+
+    On asyncio concurrent calls for the same proxy share a single resolution. For other proxies this just returns
+    ``proxy.__wrapped__``.
+    """
+    if proxy.__resolved__ or not issubclass(type(proxy), async_proxy_types()):
+        return proxy.__wrapped__
+
+    import asyncio
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return await do_aresolve(proxy, None)
+
+    key = id(proxy)
+    task = pending_resolutions.get(key)
+    if task is None or task.get_loop() is not loop:
+        task = pending_resolutions[key] = loop.create_task(do_aresolve(proxy, key))
+    return await asyncio.shield(task)
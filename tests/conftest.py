@@ -14,11 +14,14 @@ def lop_loader():
             subclass = False
             kind = name
             if name == 'slots':
+                from lazy_object_proxy.slots import AsyncProxy
                 from lazy_object_proxy.slots import Proxy
             elif name == 'simple':
+                from lazy_object_proxy.simple import AsyncProxy
                 from lazy_object_proxy.simple import Proxy
             elif name == 'cext':
                 try:
+                    from lazy_object_proxy.cext import AsyncProxy
                     from lazy_object_proxy.cext import Proxy
                 except ImportError:
                     if PYPY or GRAALPY or os.environ.get('SETUPPY_FORCE_PURE'):
@@ -59,6 +62,7 @@ def lop_subclass(request, lop_implementation):
         class submod(lop_implementation):
             subclass = True
             Proxy = type('SubclassOf_' + lop_implementation.Proxy.__name__, (lop_implementation.Proxy,), {})
+            AsyncProxy = type('SubclassOf_' + lop_implementation.AsyncProxy.__name__, (lop_implementation.AsyncProxy,), {})
 
         return submod
     else:
@@ -1750,3 +1750,86 @@ def test_asyncio_1(lop):
             asyncio.set_event_loop_policy(None)
 
     assert buffer == [1, 2, 'MyException']
+
+
+def test_async_proxy(lop):
+    import asyncio
+
+    from lazy_object_proxy import aresolve
+
+    calls = []
+
+    async def factory():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return ['foobar']
+
+    proxy = lop.AsyncProxy(factory)
+    assert not proxy.__resolved__
+    with pytest.raises(ValueError, match="AsyncProxy hasn't been resolved"):
+        len(proxy)
+
+    async def await_proxy():
+        return await proxy
+
+    async def main():
+        return await asyncio.gather(await_proxy(), await_proxy(), aresolve(proxy))
+
+    results = asyncio.run(main())
+    assert calls == [1]
+    assert results == [['foobar']] * 3
+    assert results[0] is results[1] is results[2]
+    assert proxy.__resolved__
+    assert proxy.__wrapped__ is results[0]
+    assert len(proxy) == 1
+    assert proxy == ['foobar']
+    assert asyncio.run(await_proxy()) is results[0]
+    assert calls == [1]
+
+
+def test_async_proxy_error(lop):
+    import asyncio
+
+    from lazy_object_proxy import aresolve
+
+    calls = []
+
+    async def factory():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        if len(calls) == 1:
+            raise RuntimeError('boom!')
+        return 'foobar'
+
+    proxy = lop.AsyncProxy(factory)
+
+    async def main():
+        return await asyncio.gather(aresolve(proxy), aresolve(proxy), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert calls == [1]
+    assert [str(result) for result in results] == ['boom!', 'boom!']
+    assert not proxy.__resolved__
+    assert asyncio.run(aresolve(proxy)) == 'foobar'
+    assert calls == [1, 1]
+
+
+def test_async_proxy_without_loop(lop):
+    async def factory():
+        await AsyncYield(1)
+        return 'foobar'
+
+    aproxy = lop.AsyncProxy(factory)
+    assert run_async(proxy(aproxy)) == ([1], 'foobar')
+    assert aproxy.__resolved__
+    assert str(aproxy) == 'foobar'
+
+
+def test_aresolve_regular_proxy(lop):
+    import asyncio
+
+    from lazy_object_proxy import aresolve
+
+    proxy = lop.Proxy(lambda: 'foobar')
+    assert asyncio.run(aresolve(proxy)) == 'foobar'
+    assert proxy.__resolved__
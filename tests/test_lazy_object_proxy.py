@@ -3,8 +3,11 @@ import os
 import pickle
 import platform
 import sys
+import threading
+import time
 import types
 import weakref
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 from datetime import datetime
 from decimal import Decimal
@@ -1892,3 +1895,376 @@ def test_format(lop):
 
     obj = lop.Proxy(WithFormat)
     assert f'{obj:stuff}' == "spec('stuff')"
+
+
+def test_resolve_once_threaded(lop):
+    if lop.kind != 'cext':
+        pytest.skip('Only the C extension guards the factory against concurrent calls.')
+
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def factory():
+        calls.append(1)
+        time.sleep(0.01)
+        return 'foobar'
+
+    proxy = lop.Proxy(factory)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(str(proxy))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == ['foobar'] * 8
+
+
+def test_resolve_once_threaded_failure(lop):
+    if lop.kind != 'cext':
+        pytest.skip('Only the C extension guards the factory against concurrent calls.')
+
+    calls = []
+    barrier = threading.Barrier(4)
+
+    def factory():
+        calls.append(1)
+        time.sleep(0.01)
+        if len(calls) == 1:
+            raise RuntimeError('boom!')
+        return 'foobar'
+
+    proxy = lop.Proxy(factory)
+    results = []
+
+    def worker():
+        barrier.wait()
+        try:
+            results.append(str(proxy))
+        except RuntimeError as exc:
+            results.append(exc)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1, 1]
+    assert sorted(map(str, results)) == ['boom!', 'foobar', 'foobar', 'foobar']
+
+
+def test_resolve_recursive(lop):
+    proxy = lop.Proxy(lambda: str(proxy))
+    pytest.raises(RecursionError, str, proxy)
+    assert not proxy.__resolved__
+
+
+@pytest.mark.xfail_subclass
+@pytest.mark.xfail_simple
+def test_set_module_and_doc(lop):
+    class Target:
+        pass
+
+    target = Target()
+    proxy = lop.Proxy(lambda: target)
+    proxy.__module__ = 'foo'
+    proxy.__doc__ = 'bar'
+
+    assert target.__module__ == 'foo'
+    assert target.__doc__ == 'bar'
+    assert proxy.__module__ == 'foo'
+    assert proxy.__doc__ == 'bar'
+
+
+def test_call_subclass_override(lop):
+    class CallProxy(lop.Proxy):
+        def __call__(self, *args, **kwargs):
+            return 'override', args, kwargs
+
+    proxy = CallProxy(lambda: dict)
+
+    assert proxy(1, b=2) == ('override', (1,), {'b': 2})
+
+
+def test_getattr_factory_error(lop):
+    calls = []
+
+    def factory():
+        calls.append(1)
+        raise RuntimeError('boom!')
+
+    proxy = lop.Proxy(factory)
+    pytest.raises(RuntimeError, getattr, proxy, 'foobar')
+    pytest.raises(RuntimeError, getattr, proxy, '__name__')
+    assert calls == [1, 1]
+
+
+def test_getattr_instance_dict(lop):
+    class Target:
+        name = 'target'
+
+    class LazyProxy(lop.Proxy):
+        name = None
+
+    proxy = LazyProxy(Target)
+    assert proxy.name is None
+    proxy.name = 'proxy'
+    assert proxy.name == 'proxy'
+    assert proxy.__wrapped__.name == 'target'
+
+
+@pytest.fixture(params=['utils', 'cext'])
+def unwrap_all(request):
+    if request.param == 'cext':
+        try:
+            from lazy_object_proxy.cext import unwrap_all
+        except ImportError:
+            pytest.skip(reason='C Extension not available.')
+    else:
+        from lazy_object_proxy.utils import unwrap_all
+    return unwrap_all
+
+
+def test_unwrap_all(lop, unwrap_all):
+    class Namespace:
+        pass
+
+    namespace = Namespace()
+    namespace.value = lop.Proxy(lambda: 'value')
+    resolved = lop.Proxy(lambda: 'resolved')
+    unresolved = lop.Proxy(lambda: 'unresolved')
+    str(namespace.value)
+    str(resolved)
+    container = [resolved, unresolved, {'a': resolved, 'b': (1, resolved)}, namespace, (2, 3)]
+    nested_tuple = container[4]
+
+    result = unwrap_all(container)
+
+    assert result is container
+    assert type(container[0]) is str
+    assert container[0] == 'resolved'
+    assert container[1] is unresolved
+    assert not unresolved.__resolved__
+    assert type(container[2]['a']) is str
+    assert container[2]['b'] == (1, 'resolved')
+    assert type(container[2]['b'][1]) is str
+    assert type(vars(namespace)['value']) is str
+    assert container[4] is nested_tuple
+
+
+def test_unwrap_all_resolve(lop, unwrap_all):
+    unresolved = lop.Proxy(lambda: ['foo', lop.Proxy(lambda: 'bar')])
+    result = unwrap_all((unresolved,), resolve=True)
+    assert type(result) is tuple
+    assert type(result[0]) is list
+    assert result[0] == ['foo', 'bar']
+    assert type(result[0][1]) is str
+
+
+def test_unwrap_all_proxy(lop, unwrap_all):
+    target = {'a': 1}
+    proxy = lop.Proxy(lambda: lop.Proxy(lambda: target))
+    assert unwrap_all(proxy) is proxy
+    assert unwrap_all(proxy, resolve=True) is target
+
+
+def test_unwrap_all_cycles(lop, unwrap_all):
+    resolved = lop.Proxy(lambda: 'resolved')
+    str(resolved)
+    container = [resolved]
+    container.append(container)
+    container.append({'self': container, 'tuple': (container, resolved)})
+
+    assert unwrap_all(container) is container
+    assert type(container[0]) is str
+    assert container[1] is container
+    assert container[2]['tuple'] == (container, 'resolved')
+    assert type(container[2]['tuple'][1]) is str
+
+
+def test_unwrap_all_error(lop, unwrap_all):
+    def factory():
+        raise RuntimeError('boom!')
+
+    pytest.raises(RuntimeError, unwrap_all, [lop.Proxy(factory)], resolve=True)
+
+
+def test_resolve_many(lop):
+    from lazy_object_proxy import resolve_many
+
+    barrier = threading.Barrier(3, timeout=10)
+    threads = set()
+
+    def factory(value):
+        def factory():
+            threads.add(threading.get_ident())
+            barrier.wait()
+            return value
+
+        return factory
+
+    calls = []
+    resolved = lop.Proxy(lambda: calls.append(1) or 'resolved')
+    str(resolved)
+    proxies = [lop.Proxy(factory(i)) for i in range(3)]
+
+    assert resolve_many([*proxies, resolved, 'other', proxies[0]]) == [0, 1, 2, 'resolved', 'other', 0]
+    assert all(proxy.__resolved__ for proxy in proxies)
+    assert len(threads) == 3
+    assert calls == [1]
+
+
+def test_resolve_many_executor(lop):
+    from lazy_object_proxy import resolve_many
+
+    proxies = [lop.Proxy(lambda: threading.current_thread().name) for _ in range(3)]
+    with ThreadPoolExecutor(thread_name_prefix='custom') as executor:
+        assert all(name.startswith('custom') for name in resolve_many(proxies, executor=executor))
+        assert resolve_many([lop.Proxy(lambda: 1), lop.Proxy(lambda: 2)], executor=executor) == [1, 2]
+
+
+def test_resolve_many_errors(lop):
+    from lazy_object_proxy import ResolveError
+    from lazy_object_proxy import resolve_many
+
+    def fail(message):
+        def factory():
+            raise RuntimeError(message)
+
+        return factory
+
+    first = lop.Proxy(fail('first'))
+    second = lop.Proxy(fail('second'))
+    good = lop.Proxy(lambda: 'good')
+
+    with pytest.raises(ResolveError) as excinfo:
+        resolve_many([first, good, second])
+
+    assert excinfo.value.proxies == [first, second]
+    assert [str(exc) for exc in excinfo.value.exceptions] == ['first', 'second']
+    assert good.__resolved__
+    assert not first.__resolved__
+
+    with pytest.raises(ResolveError) as excinfo:
+        resolve_many([first])
+
+    assert excinfo.value.proxies == [first]
+    assert [str(exc) for exc in excinfo.value.exceptions] == ['first']
+
+
+def test_ttl(lop):
+    if lop.kind == 'simple':
+        pytest.skip('The simple implementation has no ttl support.')
+
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return len(calls)
+
+    proxy = lop.Proxy(factory, ttl=0.05)
+    assert proxy == 1
+    assert proxy == 1
+    assert proxy.__resolved__
+    time.sleep(0.1)
+    assert not proxy.__resolved__
+    assert proxy == 2
+    assert proxy.__resolved__
+    assert calls == [1, 1]
+
+    time.sleep(0.1)
+    proxy.__wrapped__ = 'foobar'
+    assert proxy.__resolved__
+    assert proxy == 'foobar'
+    assert calls == [1, 1]
+
+
+def test_ttl_factory_error(lop):
+    if lop.kind == 'simple':
+        pytest.skip('The simple implementation has no ttl support.')
+
+    calls = []
+
+    def factory():
+        calls.append(1)
+        if len(calls) > 1:
+            raise RuntimeError('boom!')
+        return 'foobar'
+
+    proxy = lop.Proxy(factory, ttl=0.05)
+    assert proxy == 'foobar'
+    time.sleep(0.1)
+    pytest.raises(RuntimeError, str, proxy)
+    assert not proxy.__resolved__
+    pytest.raises(RuntimeError, str, proxy)
+    assert len(calls) == 3
+
+
+def test_ttl_refresh(lop):
+    if lop.kind == 'simple':
+        pytest.skip('The simple implementation has no ttl support.')
+
+    release = threading.Event()
+    threads = []
+
+    def factory():
+        threads.append(threading.current_thread())
+        if len(threads) > 1:
+            release.wait(5)
+        return len(threads)
+
+    proxy = lop.Proxy(factory, ttl=0.4, refresh=True)
+    assert proxy == 1
+    time.sleep(0.32)
+    assert proxy == 1
+    assert proxy == 1
+    release.set()
+    for _ in range(100):
+        if proxy == 2:
+            break
+        time.sleep(0.01)
+    assert proxy == 2
+    assert len(threads) == 2
+    assert threads[0] is threading.current_thread()
+    assert threads[1] is not threading.current_thread()
+
+
+def test_ttl_refresh_error(lop):
+    if lop.kind == 'simple':
+        pytest.skip('The simple implementation has no ttl support.')
+
+    calls = []
+
+    def factory():
+        calls.append(1)
+        if len(calls) > 1:
+            raise RuntimeError('boom!')
+        return 'foobar'
+
+    proxy = lop.Proxy(factory, ttl=0.4, refresh=True)
+    assert proxy == 'foobar'
+    time.sleep(0.32)
+    assert proxy == 'foobar'
+    time.sleep(0.02)
+    assert proxy == 'foobar'
+    assert len(calls) == 2
+    time.sleep(0.1)
+    pytest.raises(RuntimeError, str, proxy)
+
+
+def test_ttl_invalid(lop):
+    if lop.kind == 'simple':
+        pytest.skip('The simple implementation has no ttl support.')
+
+    pytest.raises(ValueError, lop.Proxy, str, ttl=0)
+    pytest.raises(ValueError, lop.Proxy, str, ttl=-1)
+    pytest.raises(ValueError, lop.Proxy, str, refresh=True)
+    pytest.raises(TypeError, lop.Proxy, str, ttl='1')
+    pytest.raises(TypeError, lop.Proxy, str, 1)
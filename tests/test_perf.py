@@ -1,3 +1,6 @@
+import threading
+import time
+import tracemalloc
 from functools import partial
 
 import pytest
@@ -81,3 +84,126 @@ def test_proto(benchmark, prototype):
     obj = 'foobar'
     proxied = prototype(lambda: obj)
     assert benchmark(partial(str, proxied)) == obj
+
+
+@pytest.mark.benchmark(group='cold-resolve')
+@pytest.mark.parametrize('threads', [1, 8, 64])
+@pytest.mark.parametrize('name', ['slots', 'cext', 'simple'])
+def test_perf_cold_resolve(benchmark, name, threads, lop_loader):
+    implementation = lop_loader(name)
+    obj = 'foobar'
+
+    def setup():
+        return ([implementation.Proxy(lambda: obj) for _ in range(1000)],), {}
+
+    def resolve(proxies):
+        barrier = threading.Barrier(threads)
+
+        def worker():
+            barrier.wait()
+            for proxy in proxies:
+                str(proxy)
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return proxies
+
+    proxies = benchmark.pedantic(resolve, setup=setup, rounds=20)
+    assert all(proxy.__resolved__ for proxy in proxies)
+
+
+@pytest.mark.benchmark(group='memory')
+@pytest.mark.parametrize('name', ['slots', 'cext', 'simple'])
+def test_perf_memory(benchmark, name, lop_loader):
+    implementation = lop_loader(name)
+    factory = partial(str, 'foobar')
+    count = 10000
+
+    def allocate():
+        proxies = [None] * count
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            for i in range(count):
+                proxies[i] = implementation.Proxy(factory)
+            after = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        return (after - before) / count
+
+    size = benchmark.pedantic(allocate, rounds=5)
+    benchmark.extra_info['bytes_per_proxy'] = size
+    assert size > 0
+
+
+def call_target(a, b, c=None):
+    return a
+
+
+class CallTarget:
+    def method(self, a, b, c=None):
+        return a
+
+
+@pytest.mark.benchmark(group='call')
+@pytest.mark.parametrize('kind', ['positional', 'keyword', 'method'])
+@pytest.mark.parametrize('name', ['slots', 'cext', 'simple'])
+def test_perf_call(benchmark, name, kind, lop_loader):
+    implementation = lop_loader(name)
+    if kind == 'method':
+        proxied = implementation.Proxy(lambda: CallTarget().method)
+    else:
+        proxied = implementation.Proxy(lambda: call_target)
+    if kind == 'keyword':
+        call = partial(proxied, 1, b=2, c=3)
+    else:
+        call = partial(proxied, 1, 2, 3)
+    assert benchmark(call) == 1
+
+
+class AttributeTarget:
+    def __init__(self):
+        self.attribute = 'foobar'
+
+    def method(self):
+        return 'foobar'
+
+
+@pytest.mark.benchmark(group='getattr')
+@pytest.mark.parametrize('kind', ['attribute', 'method'])
+@pytest.mark.parametrize('subclassed', [False, True], ids=['normal', 'subclassed'])
+@pytest.mark.parametrize('name', ['slots', 'cext', 'simple'])
+def test_perf_getattr(benchmark, name, subclassed, kind, lop_loader):
+    implementation = lop_loader(name)
+    proxy_type = implementation.Proxy
+    if subclassed:
+        proxy_type = type('SubclassOf_' + proxy_type.__name__, (proxy_type,), {})
+    proxied = proxy_type(AttributeTarget)
+    assert proxied.__wrapped__
+    assert benchmark(partial(getattr, proxied, kind))
+
+
+@pytest.mark.benchmark(group='resolve-many')
+@pytest.mark.parametrize('mode', ['sequential', 'resolve_many'])
+@pytest.mark.parametrize('name', ['slots', 'cext', 'simple'])
+def test_perf_resolve_many(benchmark, name, mode, lop_loader):
+    from lazy_object_proxy import resolve_many
+
+    implementation = lop_loader(name)
+
+    def factory():
+        time.sleep(0.001)
+        return 'foobar'
+
+    def setup():
+        return ([implementation.Proxy(factory) for _ in range(100)],), {}
+
+    def resolve(proxies):
+        if mode == 'resolve_many':
+            resolve_many(proxies)
+        return [str(proxy) for proxy in proxies]
+
+    assert benchmark.pedantic(resolve, setup=setup, rounds=5) == ['foobar'] * 100